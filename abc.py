@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 
 # --- Configuration ---
 # Set the page configuration for a better look and feel
@@ -12,66 +12,144 @@ st.set_page_config(
 
 # --- Data Preparation ---
 
-# Data directly from the provided table
-data = {
-    'Asset': [
-        'Fixed Deposits (FD)',
-        'Public Provident Fund (PPF)',
-        'Debt Mutual Funds',
-        'Government Bonds (G-Secs)',
-        'Senior Citizens Savings Scheme (SCSS)'
-    ],
-    'Risk': [
-        'Very Low',
-        'Very Low',
-        'Low',
-        'Very Low',
-        'Very Low'
-    ],
-    'Reward Range (%)': [
-        '5-7',
-        '7.1 (current)',
-        '6-8',
-        '6-7',
-        '8.2 (current)'
-    ],
-    'Time of Investment': [
-        '2-5 years',
-        '15 years',
-        '3-5 years',
-        '5+ years',
-        '5 years'
-    ],
-    'Allocation (%)': [30, 20, 20, 20, 10],
-    'Source': [
-        'RBI, SBI',
-        'India Post',
-        'AMFI',
-        'RBI',
-        'India Post'
-    ],
-    'Reasons': [
-        'Provides stable returns in the 5–7% range, perfect for short to medium-term goals in the next 1–5 years. No market volatility ideal for risk-averse investors. Liquidity available with penalty, suitable for emergency needs.',
-        'Government-backed, making it one of India\'s safest long-term instruments. EBT (Exempt-Exempt-Exempt) status: interest tax-free, maturity tax-free. Helps in building a retirement corpus.',
-        'Suitable for low-risk investors seeking better post-tax returns than FD. Provides liquidity, diversification, and indexation benefits for long-term investors.',
-        'Considered risk-free, backed by Government of India. Safe for wealth preservation with long-term stability.',
-        'Designed specifically for senior citizens with the highest safe interest rate (currently 8.2%). Quarterly interest payout provides regular income.'
-    ]
-}
-
-df = pd.DataFrame(data)
+# Long per-asset rationale text, kept out of the DataFrame (one entry per row,
+# in table order) so the cards below can index it directly
+REASONS = (
+    'Provides stable returns in the 5–7% range, perfect for short to medium-term goals in the next 1–5 years. No market volatility ideal for risk-averse investors. Liquidity available with penalty, suitable for emergency needs.',
+    'Government-backed, making it one of India\'s safest long-term instruments. EBT (Exempt-Exempt-Exempt) status: interest tax-free, maturity tax-free. Helps in building a retirement corpus.',
+    'Suitable for low-risk investors seeking better post-tax returns than FD. Provides liquidity, diversification, and indexation benefits for long-term investors.',
+    'Considered risk-free, backed by Government of India. Safe for wealth preservation with long-term stability.',
+    'Designed specifically for senior citizens with the highest safe interest rate (currently 8.2%). Quarterly interest payout provides regular income.',
+)
+
+# The table is static, so build it (and the risk roll-up used by the bar
+# chart) once per process. cache_resource hands back the same objects on every
+# rerun without copying them, so the frames below must be treated as read-only.
+@st.cache_resource
+def load_static_data():
+    # Data directly from the provided table
+    data = {
+        'Asset': [
+            'Fixed Deposits (FD)',
+            'Public Provident Fund (PPF)',
+            'Debt Mutual Funds',
+            'Government Bonds (G-Secs)',
+            'Senior Citizens Savings Scheme (SCSS)'
+        ],
+        'Risk': [
+            'Very Low',
+            'Very Low',
+            'Low',
+            'Very Low',
+            'Very Low'
+        ],
+        'Reward Range (%)': [
+            '5-7',
+            '7.1 (current)',
+            '6-8',
+            '6-7',
+            '8.2 (current)'
+        ],
+        'Time of Investment': [
+            '2-5 years',
+            '15 years',
+            '3-5 years',
+            '5+ years',
+            '5 years'
+        ],
+        'Allocation (%)': [30, 20, 20, 20, 10],
+        'Source': [
+            'RBI, SBI',
+            'India Post',
+            'AMFI',
+            'RBI',
+            'India Post'
+        ]
+    }
+
+    df = pd.DataFrame(data)
+
+    # Since Time of Investment is non-numeric, we will map it to a category
+    # For a simple visualization, we can show allocation by risk level as well.
+    risk_summary = df.groupby('Risk')['Allocation (%)'].sum().reset_index()
+    return df, risk_summary
+
+df, risk_summary = load_static_data()
+
+# --- Chart Builders ---
+
+# Shared chart styling
+_CHART_MARGIN = dict(l=20, r=20, t=50, b=20)
+_PIE_MARKER = dict(line=dict(color='#000000', width=0.5))
+_RISK_COLORS = {'Very Low': '#1f77b4', 'Low': '#ff7f0e'}
+
+# Figures are cached on the (hashable) allocation tuples, so reruns that don't
+# change the allocations skip rebuilding the Plotly objects. cache_resource hands
+# back the same figure without the unpickle (and re-validation) cache_data does;
+# st.plotly_chart only reads it. The data is static, so one entry each suffices.
+# Traces and layout are passed to go.Figure in one go, so Plotly validates each
+# property once instead of again in follow-up update_traces/update_layout calls.
+@st.cache_resource(max_entries=1)
+def build_pie(assets, allocs):
+    # Pie chart using Plotly for allocation
+    return go.Figure(
+        data=[go.Pie(
+            labels=assets,
+            values=allocs,
+            hole=0.3,  # Creates a donut chart
+            textinfo='percent+label',
+            marker=_PIE_MARKER,
+            # same tooltip Plotly Express generated (it took priority over hoverinfo)
+            hovertemplate='Asset=%{label}<br>Allocation (%)=%{value}<extra></extra>'
+        )],
+        layout=dict(
+            title='Portfolio Allocation by Asset Class',
+            uniformtext_minsize=12,
+            uniformtext_mode='hide',
+            legend_title="Asset Class",
+            margin=_CHART_MARGIN
+        )
+    )
+
+
+@st.cache_resource(max_entries=1)
+def build_bar(risks, allocs):
+    # Bar chart showing Allocation based on Risk, one trace per risk level so
+    # each gets its own colour and legend entry
+    return go.Figure(
+        data=[
+            go.Bar(
+                x=[risk],
+                y=[alloc],
+                name=risk,
+                marker=dict(color=_RISK_COLORS.get(risk), line=dict(width=1.5, color='black')),
+                hovertemplate='Risk=%{x}<br>Allocation (%)=%{y}<extra></extra>'  # px's tooltip
+            )
+            for risk, alloc in zip(risks, allocs)
+        ],
+        layout=dict(
+            title='Total Allocation by Risk Level',
+            barmode='relative',  # px default; plotly.js would otherwise group the traces
+            legend_title="Risk",
+            xaxis_title="Risk Category",
+            yaxis_title="Total Allocation (%)",
+            margin=_CHART_MARGIN
+        )
+    )
 
 # --- Streamlit Application Layout ---
 
-st.title("🛡️ Risk-Averse Fixed-Income Portfolio")
+# Title, intro and first section heading go out as one markdown element
 st.markdown(
     """
+    # 🛡️ Risk-Averse Fixed-Income Portfolio
+
     This dashboard visualizes the proposed allocation strategy focusing on capital preservation and stable,
     low-risk returns, primarily through government-backed and fixed-income instruments.
+
+    ### 1. Portfolio Asset Breakdown
     """
 )
-
-st.subheader("1. Portfolio Asset Breakdown")
 st.dataframe(
     df,
     use_container_width=True,
@@ -94,66 +172,30 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("2. Capital Allocation Distribution")
     
-    # Pie chart using Plotly for allocation
-    fig_pie = px.pie(
-        df,
-        values='Allocation (%)',
-        names='Asset',
-        title='Portfolio Allocation by Asset Class',
-        hole=0.3  # Creates a donut chart
-    )
-    # Customize the chart appearance
-    fig_pie.update_traces(
-        textinfo='percent+label',
-        marker=dict(line=dict(color='#000000', width=0.5)),
-        hoverinfo='label+percent+value'
-    )
-    fig_pie.update_layout(
-        uniformtext_minsize=12,
-        uniformtext_mode='hide',
-        legend_title="Asset Class",
-        margin=dict(l=20, r=20, t=50, b=20)
-    )
+    fig_pie = build_pie(tuple(df['Asset']), tuple(df['Allocation (%)']))
     st.plotly_chart(fig_pie, use_container_width=True)
 
 with col2:
     st.subheader("3. Allocation vs. Investment Horizon")
     
-    # Since Time of Investment is non-numeric, we will map it to a category
-    # For a simple visualization, we can show allocation by risk level as well.
-    risk_summary = df.groupby('Risk')['Allocation (%)'].sum().reset_index()
-    
-    # Bar chart showing Allocation based on Risk
-    fig_bar = px.bar(
-        risk_summary,
-        x='Risk',
-        y='Allocation (%)',
-        title='Total Allocation by Risk Level',
-        color='Risk',
-        color_discrete_map={'Very Low': '#1f77b4', 'Low': '#ff7f0e'} # Set custom colors
-    )
-    
-    # Add labels and customize
-    fig_bar.update_traces(marker_line_width=1.5, marker_line_color='black')
-    fig_bar.update_layout(
-        xaxis_title="Risk Category",
-        yaxis_title="Total Allocation (%)",
-        margin=dict(l=20, r=20, t=50, b=20)
-    )
+    fig_bar = build_bar(tuple(risk_summary['Risk']), tuple(risk_summary['Allocation (%)']))
     st.plotly_chart(fig_bar, use_container_width=True)
     
 st.subheader("4. Detailed Investment Rationale")
 st.info("Hover over the cards below to see the specific reasoning for the asset choice.")
 
 # Display reasons in expandable/interactive cards
-for index, row in df.iterrows():
+for row, reasons in zip(df.to_dict('records'), REASONS):
     with st.expander(f"**{row['Asset']}** - {row['Allocation (%)']}% Allocation"):
-        st.markdown(f"**Risk:** {row['Risk']}")
-        st.markdown(f"**Reward Range:** {row['Reward Range (%)']} (Expected annual return)")
-        st.markdown(f"**Time Horizon:** {row['Time of Investment']}")
-        st.markdown(f"**Source/Authority:** {row['Source']}")
-        st.markdown("---")
-        st.markdown(f"**Investment Thesis:** {row['Reasons']}")
+        # One markdown element per card instead of one per line
+        st.markdown(
+            f"**Risk:** {row['Risk']}\n\n"
+            f"**Reward Range:** {row['Reward Range (%)']} (Expected annual return)\n\n"
+            f"**Time Horizon:** {row['Time of Investment']}\n\n"
+            f"**Source/Authority:** {row['Source']}\n\n"
+            "---\n\n"
+            f"**Investment Thesis:** {reasons}"
+        )
 
 
 # --- Footer ---
@@ -0,0 +1,52 @@
+"""
+Allocation normalization kernel used by xyz.py.
+
+Streamlit re-executes the main script on every rerun, so a numba dispatcher
+defined there would be rebuilt (and reloaded from the on-disk cache) each time.
+Keeping the kernel in an imported module means it is compiled once per process
+and reused from sys.modules.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to the vectorized NumPy path
+    njit = None
+
+
+def _normalize_numpy(vals):
+    # In-place on a flat float64 buffer
+    total = vals.sum()
+    if total == 0:
+        vals[:] = 100.0 / len(vals)
+    else:
+        vals *= 100.0 / total
+    np.round(vals, 2, out=vals)
+    residue = 100.0 - vals.sum()
+    if abs(residue) > 1e-9:
+        # add residue to largest allocation (minimize distortion)
+        vals[vals.argmax()] += residue
+    return vals
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _normalize_numba(vals):
+        # Same steps as _normalize_numpy, written as a loop numba compiles to native code
+        n = vals.size
+        total = vals.sum()
+        if total == 0:
+            vals[:] = 100.0 / n
+        else:
+            vals *= 100.0 / total
+        for i in range(n):
+            vals[i] = round(vals[i] * 100.0) / 100.0
+        residue = 100.0 - vals.sum()
+        if abs(residue) > 1e-9:
+            vals[vals.argmax()] += residue
+        return vals
+
+    normalize_inplace = _normalize_numba
+else:
+    normalize_inplace = _normalize_numpy
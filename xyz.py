@@ -2,18 +2,23 @@
 """
 Conservative Investment Allocation — Streamlit App (stable)
 Save this file as app.py and run:
-    pip install streamlit pandas plotly
+    pip install streamlit numpy pandas plotly
+    pip install numba  # optional, JIT-compiles the normalization kernel (alloc_kernels.py)
     streamlit run app.py
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 from io import StringIO
 
+from alloc_kernels import normalize_inplace
+
 st.set_page_config(page_title="Conservative Portfolio", layout="wide")
 
 # ---------- Default dataset ----------
+@st.cache_data
 def default_portfolio_df():
     data = {
         "Asset": [
@@ -39,38 +44,62 @@ def default_portfolio_df():
     return pd.DataFrame(data)
 
 # ---------- Helpers ----------
+EDITOR_KEY = "editor"
+
+# Every write to "Allocation (%)" stores float64 with no NaNs, so the
+# helpers below read the column directly instead of re-coercing it.
 def sum_allocations(df):
-    return float(pd.to_numeric(df["Allocation (%)"], errors="coerce").fillna(0).sum())
+    return float(df["Allocation (%)"].to_numpy(dtype=np.float64).sum())
 
-def is_allocation_ok(df, tol=1e-6):
-    return abs(sum_allocations(df) - 100.0) <= tol
+def is_allocation_ok(total, tol=1e-6):
+    # takes the precomputed sum_allocations() total so the column is summed once per rerun
+    return abs(total - 100.0) <= tol
 
 def normalize_allocations(df):
     df = df.copy()
-    vals = pd.to_numeric(df["Allocation (%)"], errors="coerce").fillna(0.0)
-    total = vals.sum()
-    if total == 0:
-        n = len(vals)
-        normalized = pd.Series([100.0 / n] * n, index=df.index)
-    else:
-        normalized = (vals / total) * 100.0
-    rounded = normalized.round(2)
-    residue = 100.0 - rounded.sum()
-    if abs(residue) > 1e-9:
-        # add residue to largest allocation (minimize distortion)
-        if rounded.sum() != 0:
-            idx = rounded.idxmax()
-        else:
-            idx = rounded.index[0]
-        rounded.at[idx] = rounded.at[idx] + residue
-    df["Allocation (%)"] = rounded
+    vals = df["Allocation (%)"].to_numpy(dtype=np.float64, copy=True)
+    df["Allocation (%)"] = normalize_inplace(vals)
     return df
 
+def clear_editor_edits():
+    # st.data_editor keeps its edits in session state and re-applies them over
+    # the input frame; drop them whenever the allocations are replaced wholesale.
+    st.session_state.pop(EDITOR_KEY, None)
+
+@st.cache_data(max_entries=8)
 def df_to_csv_bytes(df):
+    # cached on the frame's contents, so unrelated reruns reuse the encoded bytes;
+    # bounded so every edited portfolio doesn't stay in memory for the process lifetime
     buf = StringIO()
     df.to_csv(buf, index=False)
     return buf.getvalue().encode("utf-8")
 
+# ---------- Chart builders ----------
+# Cached on the allocation tuples so reruns that don't touch allocations
+# (e.g. toggling reasons) reuse the figures instead of rebuilding them.
+# cache_resource returns the shared figure as-is (cache_data would unpickle and
+# re-validate it on every hit); st.plotly_chart only reads it. max_entries bounds
+# how many distinct allocations from all sessions stay in memory.
+# Traces and layout go straight into go.Figure so each property is validated once.
+@st.cache_resource(max_entries=32)
+def build_pie(assets, allocs):
+    return go.Figure(
+        data=[go.Pie(labels=assets, values=allocs, hole=0.35, textinfo="percent+label", textposition="inside",
+                      hovertemplate="Asset=%{label}<br>Allocation (%)=%{value}<extra></extra>")],
+        layout=dict(title="Portfolio Allocation (%)"),
+    )
+
+@st.cache_resource(max_entries=32)
+def build_bar(assets, allocs):
+    # order rows with a NumPy argsort instead of DataFrame.sort_values
+    allocs = np.asarray(allocs)
+    perm = np.argsort(allocs, kind="stable")
+    return go.Figure(
+        data=[go.Bar(x=allocs[perm], y=np.asarray(assets, dtype=object)[perm], orientation="h", text=allocs[perm],
+                      hovertemplate="Allocation (%)=%{text}<br>Asset=%{y}<extra></extra>")],
+        layout=dict(title="Allocation by Asset", xaxis_title="Allocation (%)", yaxis_title="Asset"),
+    )
+
 # ---------- App state ----------
 if "portfolio_df" not in st.session_state:
     st.session_state.portfolio_df = default_portfolio_df()
@@ -84,10 +113,10 @@ with st.sidebar:
     show_reasons = st.checkbox("Show Source & Reasons", value=True)
     if st.button("Reset to default"):
         st.session_state.portfolio_df = default_portfolio_df()
+        clear_editor_edits()
         st.experimental_rerun()
 
-    st.markdown("---")
-    st.subheader("Presets")
+    st.markdown("---\n\n### Presets")
     preset = st.selectbox("Choose a preset", ["— none —", "Default Conservative", "Ultra-safe (more FD/G-Secs)", "Income-focused (more PPF/SCSS)"])
     if st.button("Apply preset"):
         if preset == "Default Conservative":
@@ -96,46 +125,49 @@ with st.sidebar:
             st.session_state.portfolio_df["Allocation (%)"] = [40.0, 15.0, 10.0, 25.0, 10.0]
         elif preset == "Income-focused (more PPF/SCSS)":
             st.session_state.portfolio_df["Allocation (%)"] = [20.0, 30.0, 10.0, 20.0, 20.0]
+        clear_editor_edits()
         st.experimental_rerun()
 
-    st.markdown("---")
-    st.markdown("Tip: Edit allocations below and click **Save changes**. If the sum ≠ 100%, use **Normalize**.")
+    st.markdown("---\n\nTip: Edit allocations below, click **Apply**, then **Save changes**. If the sum ≠ 100%, use **Normalize**.")
 
 # ---------- Editable table (stable) ----------
-st.title("Conservative Investment Allocation")
-st.markdown("Edit `Allocation (%)` values below. Only numeric allocations are editable to keep the app stable across Streamlit versions.")
-
-cols = st.columns([3, 1.2, 1.2, 1.2, 1.4])  # header layout
-cols[0].markdown("**Asset**")
-cols[1].markdown("**Reward**")
-cols[2].markdown("**Time**")
-cols[3].markdown("**Allocation (%)**")
-cols[4].markdown("**Source**")
-
-new_allocs = []
-for i, row in df.iterrows():
-    c_asset, c_reward, c_time, c_alloc, c_source = st.columns([3, 1.2, 1.2, 1.2, 1.4])
-    c_asset.write(row["Asset"])
-    c_reward.write(row["Reward"])
-    c_time.write(row["Time of Investment"])
-    # numeric input for allocation
-    key = f"alloc_{i}"
-    current = float(pd.to_numeric(row["Allocation (%)"], errors="coerce").fillna(0.0))
-    value = c_alloc.number_input(label="", min_value=0.0, max_value=100.0, value=current, step=0.5, format="%.2f", key=key)
-    new_allocs.append(float(value))
-    c_source.write(row["Source"])
-    if show_reasons:
-        st.write(f"**Reasons:** {row['Reasons']}")
-
-# Update with new allocations
-df["Allocation (%)"] = new_allocs
+st.markdown(
+    "# Conservative Investment Allocation\n\n"
+    "Edit `Allocation (%)` values in the table below. The other columns are read-only."
+)
+
+# Fixed column set: column_order is part of data_editor's widget identity, so
+# changing it (e.g. on the reasons toggle) would recreate the editor and drop
+# any edits not yet applied.
+editor_cols = ["Asset", "Reward", "Time of Investment", "Allocation (%)", "Source"]
+# Inside a form, edits only trigger a rerun when "Apply" is pressed
+with st.form("edit_form"):
+    edited = st.data_editor(
+        df,
+        column_order=editor_cols,
+        disabled=[c for c in df.columns if c != "Allocation (%)"],
+        column_config={
+            "Allocation (%)": st.column_config.NumberColumn(min_value=0.0, max_value=100.0, step=0.01, format="%.2f"),
+        },
+        hide_index=True,
+        use_container_width=True,
+        key=EDITOR_KEY,
+    )
+    submitted = st.form_submit_button("Apply")
+
+if submitted:
+    # Update with new allocations (a cleared cell comes back as NaN)
+    df["Allocation (%)"] = edited["Allocation (%)"].fillna(0.0).astype(np.float64, copy=False)
+
+if show_reasons:
+    st.markdown("\n".join(f"- **{asset}:** {reasons}" for asset, reasons in zip(df["Asset"], df["Reasons"])))
 
 # ---------- Actions ----------
 st.markdown("---")
 a1, a2, a3 = st.columns([1,1,1])
 with a1:
     total = sum_allocations(df)
-    if is_allocation_ok(df):
+    if is_allocation_ok(total):
         st.success(f"Total allocation = {total:.2f}% (OK)")
     else:
         st.error(f"Total allocation = {total:.2f}% — not 100%")
@@ -143,6 +175,7 @@ with a2:
     if st.button("Normalize allocations → 100%"):
         df = normalize_allocations(df)
         st.session_state.portfolio_df = df
+        clear_editor_edits()
         st.success("Allocations normalized to sum 100%")
         st.experimental_rerun()
 with a3:
@@ -150,40 +183,42 @@ with a3:
         st.session_state.portfolio_df["Allocation (%)"] = df["Allocation (%)"].values
         st.success("Saved allocation changes in session")
 
-# Persist current view
-st.session_state.portfolio_df = df.copy()
+# Persist current view (df is already a private copy and is only read below)
+st.session_state.portfolio_df = df
 
 # ---------- Visualizations ----------
+# df holds the current allocations (just applied from the form, or carried over
+# from session state); the cached builders take plain tuples, so df is never mutated.
 st.subheader("Visualizations")
-chart_df = df.copy()
-chart_df["Allocation (%)"] = pd.to_numeric(chart_df["Allocation (%)"], errors="coerce").fillna(0.0)
 
 left, right = st.columns(2)
 with left:
-    if chart_df["Allocation (%)"].sum() > 0:
-        fig = px.pie(chart_df, names="Asset", values="Allocation (%)", title="Portfolio Allocation (%)", hole=0.35)
-        fig.update_traces(textinfo="percent+label", textposition="inside")
+    if total > 0:
+        fig = build_pie(tuple(df["Asset"]), tuple(df["Allocation (%)"]))
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("Set allocations > 0 to view the pie chart.")
 with right:
-    fig2 = px.bar(chart_df.sort_values("Allocation (%)", ascending=True), x="Allocation (%)", y="Asset", orientation="h", text="Allocation (%)", title="Allocation by Asset")
-    fig2.update_layout(xaxis_title="Allocation (%)")
+    fig2 = build_bar(tuple(df["Asset"]), tuple(df["Allocation (%)"]))
     st.plotly_chart(fig2, use_container_width=True)
 
 # ---------- Full table preview & export ----------
 st.subheader("Full Portfolio Details")
-st.dataframe(df, use_container_width=True)
+# Opt-in: the editor above already shows the same rows, and st.dataframe
+# re-serializes the whole frame to Arrow on every rerun.
+if st.checkbox("Show full table"):
+    st.dataframe(df, use_container_width=True)
 
 st.subheader("Export")
 csv_bytes = df_to_csv_bytes(df)
 st.download_button("Download portfolio as CSV", data=csv_bytes, file_name="conservative_portfolio.csv", mime="text/csv")
 
-st.markdown("---")
 st.markdown(
     """
+    ---
+
     **Notes**
     - This app is a demo (not investment advice). 
-    - If you'd like editable text columns too (Asset/Source/Reasons), tell me your Streamlit version and I will produce a version that uses an in-app form for editing those columns.
+    - Only `Allocation (%)` is editable; the text columns (Asset/Source) are read-only and Reasons are listed below the editor.
     """
 )